@@ -5,21 +5,81 @@ Converts Google Blogger export (Atom XML) to Jekyll-compatible Markdown files
 Includes static comments appended to each post
 """
 
-import xml.etree.ElementTree as ET
 import re
 import os
 import html
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 import urllib.parse
 
+# Prefer lxml (C-backed libxml2) for faster parsing and queries
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
 # Namespaces used in Blogger Atom feed
 NAMESPACES = {
     'atom': 'http://www.w3.org/2005/Atom',
     'blogger': 'http://schemas.google.com/blogger/2018'
 }
 
+
+def _compile_text_query(path: str):
+    """Compile a namespaced element path into a callable returning element texts"""
+    if LXML_AVAILABLE:
+        # Plain strings, so results don't keep a reference to their element
+        return ET.XPath(f'{path}/text()', namespaces=NAMESPACES, smart_strings=False)
+    return lambda elem: [e.text for e in elem.findall(path, NAMESPACES) if e.text is not None]
+
+
+def _compile_attr_query(path: str, attr: str):
+    """Compile a namespaced element path into a callable returning non-empty attributes"""
+    if LXML_AVAILABLE:
+        return ET.XPath(f'{path}/@{attr}[string-length(.) > 0]',
+                        namespaces=NAMESPACES, smart_strings=False)
+    return lambda elem: [e.get(attr) for e in elem.findall(path, NAMESPACES) if e.get(attr)]
+
+
+def _first(query, elem):
+    """Return the first result of a compiled query, or None"""
+    matches = query(elem)
+    return matches[0] if matches else None
+
+
+@lru_cache(maxsize=None)
+def _parse_iso(date_str: str) -> datetime:
+    """Parse an ISO-8601 timestamp, memoized since comments often share them"""
+    # fromisoformat only accepts a trailing 'Z' from Python 3.11 onwards
+    if date_str.endswith('Z'):
+        date_str = date_str[:-1] + '+00:00'
+    return datetime.fromisoformat(date_str)
+
+
+# Precompiled regexes used on every post
+IMG_URL_RE = re.compile(r'https?://[^"\s]+\.(?:jpg|jpeg|png|gif|bmp)', re.IGNORECASE)
+NONWORD_RE = re.compile(r'[^\w\s-]')
+DASH_RE = re.compile(r'[-\s]+')
+
+ENTRY_TAG = f"{{{NAMESPACES['atom']}}}entry"
+
+# Precompiled queries, so namespace resolution happens once rather than per call
+TYPE_QUERY = _compile_text_query('blogger:type')
+ID_QUERY = _compile_text_query('atom:id')
+TITLE_QUERY = _compile_text_query('atom:title')
+CONTENT_QUERY = _compile_text_query('atom:content')
+PUBLISHED_QUERY = _compile_text_query('atom:published')
+CATEGORIES_QUERY = _compile_attr_query('atom:category', 'term')
+FILENAME_QUERY = _compile_text_query('blogger:filename')
+PARENT_QUERY = _compile_text_query('blogger:parent')
+AUTHOR_NAME_QUERY = _compile_text_query('atom:author/atom:name')
+STATUS_QUERY = _compile_text_query('blogger:status')
+
 class BloggerToJekyll:
     def __init__(self, feed_path: str, output_dir: str):
         self.feed_path = feed_path
@@ -27,55 +87,55 @@ class BloggerToJekyll:
         self.posts_dir = self.output_dir / '_posts'
         self.posts_dir.mkdir(parents=True, exist_ok=True)
 
-        # Parse XML
-        self.tree = ET.parse(feed_path)
-        self.root = self.tree.getroot()
-
         # Storage for posts and comments
         self.posts = {}
         self.comments = {}
         self.image_urls = set()
 
     def parse_entries(self):
-        """Parse all entries from the feed and separate posts from comments"""
-        for entry in self.root.findall('atom:entry', NAMESPACES):
-            entry_type = entry.find('blogger:type', NAMESPACES)
-
-            if entry_type is not None:
-                if entry_type.text == 'POST':
-                    self._parse_post(entry)
-                elif entry_type.text == 'COMMENT':
-                    self._parse_comment(entry)
+        """Stream all entries from the feed and separate posts from comments"""
+        # Handle each entry as soon as it is complete and then discard it,
+        # so memory stays bounded by one entry rather than the whole feed
+        if LXML_AVAILABLE:
+            events = ET.iterparse(self.feed_path, events=('end',), tag=ENTRY_TAG)
+        else:
+            events = ET.iterparse(self.feed_path, events=('end',))
+
+        for _, entry in events:
+            if entry.tag != ENTRY_TAG:
+                continue
+
+            entry_type = _first(TYPE_QUERY, entry)
+
+            if entry_type == 'POST':
+                self._parse_post(entry)
+            elif entry_type == 'COMMENT':
+                self._parse_comment(entry)
+
+            entry.clear()
+            if LXML_AVAILABLE:
+                # Also drop the already-processed siblings held by the parent
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
 
     def _parse_post(self, entry):
         """Parse a blog post entry"""
-        post_id = entry.find('atom:id', NAMESPACES).text
+        post_id = _first(ID_QUERY, entry)
 
         # Extract basic info
-        title_elem = entry.find('atom:title', NAMESPACES)
-        title = title_elem.text if title_elem is not None and title_elem.text else 'Untitled'
-
-        content_elem = entry.find('atom:content', NAMESPACES)
-        content = content_elem.text if content_elem is not None else ''
-
-        published_elem = entry.find('atom:published', NAMESPACES)
-        published = published_elem.text if published_elem is not None else None
+        title = _first(TITLE_QUERY, entry) or 'Untitled'
+        content = _first(CONTENT_QUERY, entry) or ''
+        published = _first(PUBLISHED_QUERY, entry)
 
         # Extract categories/tags
-        categories = []
-        for cat in entry.findall('atom:category', NAMESPACES):
-            term = cat.get('term')
-            if term:
-                categories.append(term)
+        categories = CATEGORIES_QUERY(entry)
 
         # Extract filename (contains original Blogger URL path)
-        filename_elem = entry.find('blogger:filename', NAMESPACES)
-        original_path = filename_elem.text if filename_elem is not None else None
+        original_path = _first(FILENAME_QUERY, entry)
 
         # Extract image URLs from content
         if content:
-            img_urls = re.findall(r'https?://[^"\s]+\.(?:jpg|jpeg|png|gif|bmp)', content, re.IGNORECASE)
-            self.image_urls.update(img_urls)
+            self.image_urls.update(m.group(0) for m in IMG_URL_RE.finditer(content))
 
         self.posts[post_id] = {
             'id': post_id,
@@ -89,25 +149,17 @@ class BloggerToJekyll:
 
     def _parse_comment(self, entry):
         """Parse a comment entry"""
-        parent_elem = entry.find('blogger:parent', NAMESPACES)
-        if parent_elem is None:
+        parent_id = _first(PARENT_QUERY, entry)
+        if parent_id is None:
             return
 
-        parent_id = parent_elem.text
-
         # Extract comment details
-        author_elem = entry.find('atom:author/atom:name', NAMESPACES)
-        author = author_elem.text if author_elem is not None else 'Anonymous'
-
-        content_elem = entry.find('atom:content', NAMESPACES)
-        content = content_elem.text if content_elem is not None else ''
-
-        published_elem = entry.find('atom:published', NAMESPACES)
-        published = published_elem.text if published_elem is not None else None
+        author = _first(AUTHOR_NAME_QUERY, entry) or 'Anonymous'
+        content = _first(CONTENT_QUERY, entry) or ''
+        published = _first(PUBLISHED_QUERY, entry)
 
         # Check if it's spam
-        status_elem = entry.find('blogger:status', NAMESPACES)
-        is_spam = status_elem is not None and status_elem.text == 'SPAM_COMMENT'
+        is_spam = _first(STATUS_QUERY, entry) == 'SPAM_COMMENT'
 
         if not is_spam:
             comment = {
@@ -119,22 +171,24 @@ class BloggerToJekyll:
             if parent_id in self.posts:
                 self.posts[parent_id]['comments'].append(comment)
 
-    def _sanitize_filename(self, title: str) -> str:
+    @staticmethod
+    def _sanitize_filename(title: str) -> str:
         """Convert title to valid filename"""
         # Convert to lowercase and replace spaces with hyphens
         filename = title.lower()
-        filename = re.sub(r'[^\w\s-]', '', filename)
-        filename = re.sub(r'[-\s]+', '-', filename)
+        filename = NONWORD_RE.sub('', filename)
+        filename = DASH_RE.sub('-', filename)
         return filename[:100]  # Limit length
 
-    def _format_date(self, date_str: str) -> Tuple[str, str]:
+    @staticmethod
+    def _format_date(date_str: str) -> Tuple[str, str]:
         """Parse and format date for Jekyll"""
         if not date_str:
             # Use a default date if none provided
             return '2008-01-01', '2008-01-01 00:00:00 +0000'
 
         # Parse ISO format datetime
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        dt = _parse_iso(date_str)
 
         # Jekyll filename format
         jekyll_date = dt.strftime('%Y-%m-%d')
@@ -144,7 +198,8 @@ class BloggerToJekyll:
 
         return jekyll_date, full_date
 
-    def _convert_content(self, content: str) -> str:
+    @staticmethod
+    def _convert_content(content: str) -> str:
         """Convert HTML content - we'll keep it as HTML within Markdown"""
         if not content:
             return ''
@@ -157,13 +212,19 @@ class BloggerToJekyll:
 
         return content
 
-    def _format_comments_html(self, comments: List[Dict]) -> str:
+    @staticmethod
+    def _format_comments_html(comments: List[Dict]) -> str:
         """Format comments as static HTML to append to post"""
         if not comments:
             return ''
 
-        # Sort comments by date
-        comments_sorted = sorted(comments, key=lambda c: c['published'] or '')
+        # Sort comments by date; ISO-8601 timestamps compare lexically and
+        # exports are usually already in order, so check before sorting
+        keys = [c['published'] or '' for c in comments]
+        if all(a <= b for a, b in zip(keys, keys[1:])):
+            comments_sorted = comments
+        else:
+            comments_sorted = sorted(comments, key=lambda c: c['published'] or '')
 
         html_parts = [
             '\n\n---\n\n',
@@ -172,13 +233,14 @@ class BloggerToJekyll:
         ]
 
         for comment in comments_sorted:
-            author = html.escape(comment['author'] or 'Anonymous')
-            content = html.unescape(comment['content']) if comment['content'] else ''
+            # Author and content are normalized in _parse_comment
+            author = html.escape(comment['author'])
+            content = html.unescape(comment['content'])
 
             # Format date
             date_str = ''
             if comment['published']:
-                dt = datetime.fromisoformat(comment['published'].replace('Z', '+00:00'))
+                dt = _parse_iso(comment['published'])
                 date_str = dt.strftime('%B %d, %Y at %I:%M %p')
 
             html_parts.append(f'''
@@ -200,44 +262,31 @@ class BloggerToJekyll:
         """Convert all posts to Jekyll format"""
         print(f"Converting {len(self.posts)} posts...")
 
-        for post_id, post in self.posts.items():
-            try:
-                jekyll_date, full_date = self._format_date(post['published'])
-                filename = self._sanitize_filename(post['title'])
-                filepath = self.posts_dir / f"{jekyll_date}-{filename}.md"
-
-                # Create front matter
-                front_matter = ['---']
-                safe_title = post['title'].replace('"', '\\"')
-                front_matter.append(f'title: "{safe_title}"')
-                front_matter.append(f"date: {full_date}")
-
-                if post['categories']:
-                    front_matter.append('categories:')
-                    for cat in post['categories']:
-                        front_matter.append(f"  - {cat}")
+        # Collect progress lines and emit them once instead of per post
+        converted = []
 
-                if post['original_path']:
-                    front_matter.append(f"blogger_orig_url: {post['original_path']}")
+        # Rendering is CPU-bound and independent per post, so spread it
+        # across processes and write each file as its result comes back
+        posts = list(self.posts.values())
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(_convert_one, post, self.posts_dir) for post in posts]
 
-                front_matter.append('---\n')
+            for post, future in zip(posts, futures):
+                try:
+                    filepath, data = future.result()
 
-                # Combine content with comments
-                content = self._convert_content(post['content'])
-                comments_html = self._format_comments_html(post['comments'])
+                    with open(filepath, 'wb', buffering=1 << 20) as f:
+                        f.write(data)
 
-                full_content = '\n'.join(front_matter) + '\n' + content + comments_html
+                    converted.append(f"  ✓ {filepath.name} ({len(post['comments'])} comments)")
 
-                # Write file
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(full_content)
+                except Exception as e:
+                    import traceback
+                    print(f"  ✗ Error converting post '{post['title']}': {e}")
+                    traceback.print_exc()
 
-                print(f"  ✓ {filepath.name} ({len(post['comments'])} comments)")
-
-            except Exception as e:
-                import traceback
-                print(f"  ✗ Error converting post '{post['title']}': {e}")
-                traceback.print_exc()
+        if converted:
+            print('\n'.join(converted))
 
     def generate_image_list(self):
         """Generate a list of image URLs that need to be downloaded"""
@@ -264,6 +313,31 @@ class BloggerToJekyll:
         print("="*60)
 
 
+def _convert_one(post: Dict, posts_dir: Path) -> Tuple[Path, bytes]:
+    """Render a single post to its Jekyll file path and UTF-8 contents"""
+    jekyll_date, full_date = BloggerToJekyll._format_date(post['published'])
+    filename = BloggerToJekyll._sanitize_filename(post['title'])
+    filepath = posts_dir / f"{jekyll_date}-{filename}.md"
+
+    # Create front matter
+    safe_title = post['title'].replace('"', '\\"')
+    cats = ''.join(f"  - {cat}\n" for cat in post['categories'])
+    cat_block = f"categories:\n{cats}" if cats else ''
+    orig = f"blogger_orig_url: {post['original_path']}\n" if post['original_path'] else ''
+    front_matter = f'---\ntitle: "{safe_title}"\ndate: {full_date}\n{cat_block}{orig}---\n\n'
+
+    # Combine content with comments
+    content = BloggerToJekyll._convert_content(post['content'])
+    comments_html = BloggerToJekyll._format_comments_html(post['comments'])
+
+    # Join pre-encoded pieces rather than building one big string first
+    return filepath, b''.join([
+        front_matter.encode('utf-8'),
+        content.encode('utf-8'),
+        comments_html.encode('utf-8'),
+    ])
+
+
 def main():
     # Paths
     script_dir = Path(__file__).parent
@@ -1,44 +1,140 @@
 #!/usr/bin/env python3
 """
 Download missing blog images and copy local ones
+
+Requires the requests package (pip install requests)
 """
 
-import urllib.request
+import urllib.parse
 import os
 import shutil
+import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import time
 
-def download_image(url, dest_path):
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_WORKERS = 16
+MAX_CONNECTIONS_PER_HOST = 4
+COPY_BUFFER_SIZE = 128 * 1024  # Same buffer size coreutils cp uses
+
+# Shared session so worker threads reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.headers['User-Agent'] = 'Mozilla/5.0'  # Avoid bot detection
+_adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=2 * MAX_WORKERS)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# One semaphore per hostname so we stay polite without serializing everything
+_host_limits = defaultdict(lambda: threading.Semaphore(MAX_CONNECTIONS_PER_HOST))
+_host_limits_lock = threading.Lock()
+
+def _host_limit(url):
+    """Return the semaphore limiting concurrent requests to the URL's host"""
+    host = urllib.parse.urlsplit(url).hostname or ''
+    with _host_limits_lock:
+        return _host_limits[host]
+
+def download_image(url, dest_path, buffer_size=COPY_BUFFER_SIZE):
     """Download an image from URL to destination path"""
+    # Stream into a temporary file so an interrupted download never leaves
+    # a truncated image behind that a rerun would mistake for a finished one
+    part_path = dest_path.with_name(dest_path.name + '.part')
     try:
-        # Add headers to avoid bot detection
-        req = urllib.request.Request(
-            url,
-            headers={'User-Agent': 'Mozilla/5.0'}
-        )
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            with open(dest_path, 'wb') as out_file:
-                out_file.write(response.read())
+        with SESSION.get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(part_path, 'wb') as out_file:
+                shutil.copyfileobj(response.raw, out_file, length=buffer_size)
+        os.replace(part_path, dest_path)
 
         print(f"  ✓ Downloaded: {dest_path.name}")
         return True
 
     except Exception as e:
+        part_path.unlink(missing_ok=True)
         print(f"  ✗ Failed to download {url}: {e}")
         return False
 
+def _is_up_to_date(src, dest):
+    """Check whether dest already matches src in size and modification time"""
+    try:
+        src_stat = os.stat(src)
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    return (src_stat.st_size == dest_stat.st_size
+            and int(src_stat.st_mtime) == int(dest_stat.st_mtime))
+
+def _fast_copy(src, dest):
+    """Copy file contents in the kernel with sendfile, then copy metadata"""
+    # Only Linux sendfile can write to a regular file (macOS needs a socket)
+    if not sys.platform.startswith('linux'):
+        shutil.copy2(src, dest)
+        return
+
+    try:
+        with open(src, 'rb') as s, open(dest, 'wb') as d:
+            remaining = os.fstat(s.fileno()).st_size
+            offset = 0
+            while remaining > 0:
+                sent = os.sendfile(d.fileno(), s.fileno(), offset, remaining)
+                if sent == 0:
+                    raise EOFError(f"{src} ended after {offset} bytes")
+                offset += sent
+                remaining -= sent
+    except OSError:
+        # Some filesystems reject sendfile (EINVAL/ENOSYS)
+        shutil.copy2(src, dest)
+        return
+
+    shutil.copystat(src, dest)
+
 def copy_local_image(src, dest):
     """Copy a local image file"""
     try:
-        shutil.copy2(src, dest)
+        if _is_up_to_date(src, dest):
+            print(f"  - Up to date: {dest.name}")
+            return True
+        _fast_copy(src, dest)
         print(f"  ✓ Copied: {dest.name}")
         return True
     except Exception as e:
         print(f"  ✗ Failed to copy {src}: {e}")
         return False
 
+def _image_filename(url):
+    """Extract the destination filename from an image URL"""
+    filename = url.split('/')[-1]
+
+    # Clean up filename
+    if '?' in filename:
+        filename = filename.split('?')[0]
+
+    return filename
+
+def _fetch_one(url, output_dir, local_albums_dir):
+    """Copy an image from the local albums if present, otherwise download it"""
+    filename = _image_filename(url)
+    dest_path = output_dir / filename
+
+    # Check if we have this image locally
+    local_path = local_albums_dir / filename
+    if local_path.exists():
+        return copy_local_image(local_path, dest_path)
+
+    # Skip images already downloaded by a previous run
+    if dest_path.exists() and dest_path.stat().st_size > 0:
+        print(f"  - Already downloaded: {dest_path.name}")
+        return True
+
+    # Download from URL
+    with _host_limit(url):
+        return download_image(url, dest_path)
+
 def main():
     script_dir = Path(__file__).parent
     images_file = script_dir / 'jekyll_output' / 'images_to_download.txt'
@@ -54,24 +150,17 @@ def main():
     with open(images_file) as f:
         urls = [line.strip() for line in f if line.strip()]
 
-    for url in urls:
-        # Extract filename from URL
-        filename = url.split('/')[-1]
-
-        # Clean up filename
-        if '?' in filename:
-            filename = filename.split('?')[0]
-
-        dest_path = output_dir / filename
-
-        # Check if we have this image locally
-        local_path = local_albums_dir / filename
-        if local_path.exists():
-            copy_local_image(local_path, dest_path)
-        else:
-            # Download from URL
-            download_image(url, dest_path)
-            time.sleep(0.5)  # Be nice to servers
+    # Several URLs (e.g. different thumbnail sizes) can map to the same file;
+    # keep only the last one so parallel workers never write the same path
+    urls = list({_image_filename(url): url for url in urls}.values())
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(_fetch_one, url, output_dir, local_albums_dir)
+            for url in urls
+        ]
+        for future in as_completed(futures):
+            future.result()
 
     print("="*60)
     print(f"Images saved to: {output_dir}")
@@ -15,10 +15,13 @@ potentially human-generated (which often shows patterns).
 
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from collections import Counter
 from typing import Tuple, List, Dict
 
+import numpy as np
+
 # Try to import scipy for chi-square p-values
 try:
     from scipy import stats
@@ -29,6 +32,12 @@ except ImportError:
     print("Install with: pip install scipy\n")
 
 
+# Patterns for cleaning up coin flip files
+COMMENT_LINE_RE = re.compile(r'^[^\S\n]*#.*$', re.MULTILINE)
+NON_FLIP_RE = re.compile(r'[^HT]+')
+UPPERCASE_FLIPS = str.maketrans('ht', 'HT')
+
+
 def load_flips(filepath: Path) -> str:
     """
     Load coin flip sequence from a file.
@@ -40,16 +49,83 @@ def load_flips(filepath: Path) -> str:
         String containing only 'H' and 'T' characters
     """
     with open(filepath, 'r') as f:
-        content = f.read()
+        return load_flips_from_str(f.read())
+
+
+def load_flips_from_str(content: str) -> str:
+    """
+    Parse a coin flip sequence from file contents.
+
+    Args:
+        content: Text in the coin flip file format
 
+    Returns:
+        String containing only 'H' and 'T' characters
+    """
     # Remove comments (lines starting with #)
-    lines = [line for line in content.split('\n') if not line.strip().startswith('#')]
-    content = ''.join(lines)
+    content = COMMENT_LINE_RE.sub('', content)
 
     # Extract only H and T characters (case insensitive)
-    flips = ''.join(c.upper() for c in content if c.upper() in 'HT')
+    return NON_FLIP_RE.sub('', content.translate(UPPERCASE_FLIPS))
+
+
+# The tests below all start from the same arrays, so each sequence is only
+# converted once. Cached arrays are read-only to keep callers from mutating them.
+@lru_cache(maxsize=8)
+def flips_to_array(flips: str) -> np.ndarray:
+    """
+    Convert a coin flip sequence to a numeric array.
+
+    Args:
+        flips: String of H and T characters
+
+    Returns:
+        Read-only uint8 array with H=1 and T=0
+    """
+    raw = np.frombuffer(flips.encode('ascii'), dtype=np.uint8)
+    # Reinterpret the boolean mask as 0/1 bytes in place rather than copying
+    arr = (raw == ord('H')).view(np.uint8)
+    arr.flags.writeable = False
+    return arr
+
 
-    return flips
+@lru_cache(maxsize=8)
+def get_transitions(flips: str) -> np.ndarray:
+    """
+    Mark where consecutive flips differ.
+
+    Args:
+        flips: String of H and T characters
+
+    Returns:
+        Read-only uint8 array of length n-1 where 1 means flip[i] != flip[i+1]
+    """
+    arr = flips_to_array(flips)
+    transitions = arr[1:] ^ arr[:-1]
+    transitions.flags.writeable = False
+    return transitions
+
+
+def _run_starts(sequence: str) -> np.ndarray:
+    """Return run start offsets followed by the sequence length."""
+    transitions = get_transitions(sequence)
+    return np.r_[0, np.flatnonzero(transitions) + 1, len(sequence)]
+
+
+def get_run_lengths(sequence: str) -> np.ndarray:
+    """
+    Compute the length of each run in a sequence.
+
+    Args:
+        sequence: String of H and T characters
+
+    Returns:
+        Array of run lengths, in order
+    """
+    if not sequence:
+        return np.empty(0, dtype=np.int64)
+
+    return np.diff(_run_starts(sequence))
 
 
 def get_runs(sequence: str) -> List[str]:
@@ -67,18 +143,12 @@ def get_runs(sequence: str) -> List[str]:
     if not sequence:
         return []
 
-    runs = []
-    current_run = sequence[0]
+    starts = _run_starts(sequence).tolist()
+    return [sequence[a:b] for a, b in zip(starts[:-1], starts[1:])]
 
-    for char in sequence[1:]:
-        if char == current_run[-1]:
-            current_run += char
-        else:
-            runs.append(current_run)
-            current_run = char
 
-    runs.append(current_run)
-    return runs
+# Pair names indexed by their 2-bit code (H=1, T=0)
+PAIR_CODES = ['TT', 'TH', 'HT', 'HH']
 
 
 def chi_square_test(observed: List[int], expected: List[float]) -> Tuple[float, float, int]:
@@ -112,8 +182,8 @@ def analyze_proportion(flips: str) -> Dict:
     Uses chi-square test to compare observed proportions to expected.
     """
     n = len(flips)
-    heads = flips.count('H')
-    tails = flips.count('T')
+    heads = int(np.count_nonzero(flips_to_array(flips)))
+    tails = n - heads
 
     observed = [heads, tails]
     expected = [n / 2, n / 2]
@@ -142,9 +212,8 @@ def analyze_run_lengths(flips: str) -> Dict:
     Expected number of runs of length k = n / 2^(k+1)
     """
     n = len(flips)
-    runs = get_runs(flips)
-    run_lengths = [len(run) for run in runs]
-    run_counts = Counter(run_lengths)
+    run_lengths = get_run_lengths(flips)
+    run_counts = Counter(run_lengths.tolist())
 
     # Group runs into buckets (1, 2, 3, 4, 5+)
     buckets = {1: 0, 2: 0, 3: 0, 4: 0, '5+': 0}
@@ -171,7 +240,7 @@ def analyze_run_lengths(flips: str) -> Dict:
 
     return {
         'test_name': 'Run-Length Distribution Test',
-        'total_runs': len(runs),
+        'total_runs': len(run_lengths),
         'buckets': buckets,
         'expected': expected,
         'chi_square': chi_sq,
@@ -193,7 +262,7 @@ def analyze_alternations(flips: str) -> Dict:
         return {'test_name': 'Alternation Test', 'error': 'Sequence too short'}
 
     # Count alternations
-    alternations = sum(1 for i in range(len(flips) - 1) if flips[i] != flips[i + 1])
+    alternations = int(np.count_nonzero(get_transitions(flips)))
     same = n - 1 - alternations
 
     # Expected: 50% alternations, 50% same
@@ -227,9 +296,11 @@ def analyze_pairs(flips: str) -> Dict:
     if n < 2:
         return {'test_name': 'Pairs Test', 'error': 'Sequence too short'}
 
-    # Count pairs
-    pairs = [flips[i:i+2] for i in range(len(flips) - 1)]
-    pair_counts = Counter(pairs)
+    # Count pairs by packing each pair into a 2-bit code (H=1, T=0)
+    arr = flips_to_array(flips)
+    codes = (arr[:-1] << 1) | arr[1:]
+    counts = np.bincount(codes, minlength=4).tolist()
+    pair_counts = {pair: count for pair, count in zip(PAIR_CODES, counts) if count}
 
     observed = [pair_counts.get(p, 0) for p in ['HH', 'HT', 'TH', 'TT']]
     expected = [(n - 1) / 4] * 4
@@ -259,20 +330,20 @@ def analyze_serial_correlation(flips: str, lag: int = 1) -> Dict:
         return {'test_name': 'Serial Correlation Test', 'error': 'Sequence too short'}
 
     # Convert to numeric
-    numeric = [1 if f == 'H' else 0 for f in flips]
+    numeric = flips_to_array(flips).astype(np.float64)
 
     # Calculate correlation
     x = numeric[:-lag]
     y = numeric[lag:]
 
     n_pairs = len(x)
-    mean_x = sum(x) / n_pairs
-    mean_y = sum(y) / n_pairs
+    dx = x - x.mean()
+    dy = y - y.mean()
 
     # Covariance and standard deviations
-    cov = sum((x[i] - mean_x) * (y[i] - mean_y) for i in range(n_pairs)) / n_pairs
-    std_x = (sum((xi - mean_x) ** 2 for xi in x) / n_pairs) ** 0.5
-    std_y = (sum((yi - mean_y) ** 2 for yi in y) / n_pairs) ** 0.5
+    cov = float(np.dot(dx, dy)) / n_pairs
+    std_x = (float(np.dot(dx, dx)) / n_pairs) ** 0.5
+    std_y = (float(np.dot(dy, dy)) / n_pairs) ** 0.5
 
     if std_x * std_y == 0:
         correlation = 0
@@ -424,9 +495,11 @@ def main():
 
     # Try to load and analyze user sequence
     if user_file.exists():
-        user_flips = load_flips(user_file)
+        # Read once; the raw text is also needed for the placeholder check
+        user_text = user_file.read_text()
+        user_flips = load_flips_from_str(user_text)
 
-        if len(user_flips) > 0 and 'REPLACE' not in open(user_file).read():
+        if len(user_flips) > 0 and 'REPLACE' not in user_text:
             print("\n" + "#" * 70)
             print("# ANALYSIS: User-Generated Sequence")
             print("#" * 70)